@@ -1,10 +1,33 @@
 # app/main.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.chat import router as chat_router
+from app.rag import warmup
+
+# usamos el logger de uvicorn para que los mensajes salgan con los del server
+logger = logging.getLogger("uvicorn.error")
+
+# tope para el warmup: si Pinecone no responde, arrancamos igual en vez de
+# que falle el startup probe de Cloud Run
+_WARMUP_TIMEOUT = 10.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # calentamos la conexión a Pinecone antes de recibir tráfico
+    try:
+        await asyncio.wait_for(asyncio.to_thread(warmup), timeout=_WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("El warmup de Pinecone tardó más de %ss; arrancamos igual.", _WARMUP_TIMEOUT)
+    yield
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import traceback
 import os
 import asyncio
@@ -67,6 +68,9 @@ from dotenv import load_dotenv
 # Carga las variables de entorno desde el archivo .env
 load_dotenv()
 
+# usamos el logger de uvicorn para que los mensajes salgan con los del server
+logger = logging.getLogger("uvicorn.error")
+
 
 # ============================
 # 2) HELPERS DE FORMATEO
@@ -188,10 +192,17 @@ def _clean_env(name: str) -> str:
     # saca BOM y espacios invisibles
     return os.environ[name].replace("\ufeff", "").strip()
 
+# Reintentos y timeout de las llamadas a OpenAI: el SDK ya hace backoff
+# exponencial (respetando Retry-After en los 429) sin bloquear el event loop.
+_OPENAI_MAX_RETRIES = 5
+_OPENAI_TIMEOUT = 60.0
+
 # Embeddings para Pinecone (usa OPENAI_API_KEY desde el entorno)
 _embeddings = OpenAIEmbeddings(
     model="text-embedding-3-small",
     api_key=_clean_env("OPENAI_API_KEY"),  # <-- clave limpia
+    max_retries=_OPENAI_MAX_RETRIES,
+    timeout=_OPENAI_TIMEOUT,
 )
 
 # Nombre del índice y namespace
@@ -207,7 +218,11 @@ async def retrieve_relevant_docs(question: str, k: int = 4) -> List[Document]:
     
     query_vector = await _embeddings.aembed_query(question)
 
-    res = _index.query(
+    # el cliente de Pinecone es sincrónico: lo corremos en un thread para no
+    # bloquear el event loop (y los streams de otros requests). Los reintentos
+    # ante 429 ya los hace el propio SDK (pinecone 10.x).
+    res = await asyncio.to_thread(
+        _index.query,
         namespace=_PINECONE_NAMESPACE,
         vector=query_vector,
         top_k=k,
@@ -258,6 +273,8 @@ def _build_llm() -> ChatOpenAI:
         temperature=0.2,
         streaming=True,  # IMPORTANTE para poder hacer astream
         api_key=_clean_env("OPENAI_API_KEY"),  # <-- clave limpia
+        max_retries=_OPENAI_MAX_RETRIES,
+        timeout=_OPENAI_TIMEOUT,
     )
 
 
@@ -290,6 +307,25 @@ def _build_chain():
     return chain
 
 
+# La chain no tiene estado por request: la armamos una sola vez al importar
+# el módulo en vez de reconstruir prompt + LLM en cada llamada.
+_chain = _build_chain()
+
+
+def warmup() -> None:
+    """
+    Calienta la conexión con Pinecone (TLS + auth) para que el primer
+    request no pague ese round-trip.
+
+    Si falla no cortamos el arranque (el primer request lo reintenta solo),
+    pero lo logueamos: una key o un índice mal configurados rompen todo /chat.
+    """
+    try:
+        _index.describe_index_stats()
+    except Exception:
+        logger.error("Falló el warmup de Pinecone:\n%s", traceback.format_exc())
+
+
 # ============================
 # 5) FUNCIÓN PRINCIPAL: respond_stream
 # ============================
@@ -344,10 +380,8 @@ async def respond_stream(messages: List[Any]) -> AsyncGenerator[Dict[str, Any],
     context_str = _format_docs(docs)
 
     # -------------------------
-    # 3) Construir chain (prompt + llm)
+    # 3) Input de la chain (prompt + llm)
     # -------------------------
-    chain = _build_chain()
-
     # Input que va a consumir la chain (coincide con las variables del prompt).
     chain_input = {
         "history": history_str,
@@ -358,16 +392,14 @@ async def respond_stream(messages: List[Any]) -> AsyncGenerator[Dict[str, Any],
     # -------------------------
     # 4) Llamar al LLM en streaming
     # -------------------------
-
-    full_answer = ""
+    # El frontend ya arma la respuesta con los chunks, así que no la
+    # acumulamos acá: cada chunk se manda y se suelta.
 
     try:
-        async for chunk in chain.astream(chain_input):
+        async for chunk in _chain.astream(chain_input):
             if not chunk:
                 continue
 
-            full_answer += chunk
-
             yield {
                 "chunk": chunk,
             }
@@ -388,9 +420,7 @@ async def respond_stream(messages: List[Any]) -> AsyncGenerator[Dict[str, Any],
     # 5) Evento final
     # -------------------------
     # En este punto ya terminamos de streamear todos los tokens.
-    # Mandamos un evento final con:
-    # - respuesta completa
-    # - fuentes (simplificadas)
+    # Mandamos un evento final con las fuentes (simplificadas).
     yield {
         "done": True,
         "citations":citations